@@ -1,398 +1,1213 @@
-#!/usr/bin/env python3.11
-"""
-Simple Crawl4AI wrapper script for Node.js integration
-Usage: python3.11 scrape.py <url> [config_json]
-"""
-
-import asyncio
-import sys
-import json
-import os
-import logging
-from pathlib import Path
-
-# Redirect Crawl4AI logging to stderr to keep stdout clean for JSON
-logging.basicConfig(
-    level=logging.WARNING,  # Only show warnings and errors
-    format='%(message)s',
-    stream=sys.stderr
-)
-
-try:
-    from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
-    from crawl4ai import MemoryAdaptiveDispatcher, CrawlerMonitor, DisplayMode
-    from crawl4ai import RateLimiter
-    from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
-    import asyncio
-except ImportError as e:
-    print(json.dumps({
-        "success": False,
-        "error": f"Crawl4AI not installed: {e}. Run: pip install crawl4ai && crawl4ai-setup",
-        "url": sys.argv[1] if len(sys.argv) > 1 else "",
-        "status_code": 0,
-        "markdown": ""
-    }))
-    sys.exit(1)
-
-async def batch_crawl_native(urls: list, config_options: dict):
-    """
-    Native Crawl4AI batch processing using arun_many() and all native features
-    Implements the standards-compliant approach from our implementation plan
-    """
-    try:
-        # Native configuration with all built-in options
-        crawl_config = CrawlerRunConfig(
-            cache_mode=getattr(CacheMode, config_options.get('cache_mode', 'ENABLED'))
-        )
-        
-        # Add session_id if provided
-        if config_options.get('session_id'):
-            crawl_config.session_id = config_options.get('session_id')
-        
-        # COMPLETE native memory management (v0.7.x compliant)
-        dispatcher = MemoryAdaptiveDispatcher(
-            memory_threshold_percent=config_options.get('memory_threshold', 70.0),
-            check_interval=config_options.get('check_interval', 1.0),  # Native monitoring interval
-            max_session_permit=config_options.get('max_sessions', 10),
-            memory_wait_timeout=config_options.get('memory_wait_timeout', 300.0),  # v0.7.x parameter
-            rate_limiter=RateLimiter(
-                base_delay=tuple(config_options.get('base_delay', [0.5, 1.5])),
-                max_delay=config_options.get('max_delay', 30.0),
-                max_retries=config_options.get('max_retries', 5)
-            ) if config_options.get('enable_rate_limiting', True) else None,
-            monitor=None  # Disable monitor UI for subprocess to keep stdout clean
-        )
-        
-        # Native browser configuration with optional persistence
-        browser_config = BrowserConfig(
-            headless=config_options.get('headless', True),
-            viewport_width=1280,
-            viewport_height=720,
-            verbose=False,
-            extra_args=[
-                "--no-sandbox",
-                "--disable-dev-shm-usage", 
-                "--disable-gpu"
-            ]
-        )
-        
-        # Add persistent browser options if specified
-        if config_options.get('persistent_browser'):
-            browser_config.use_managed_browser = True
-        if config_options.get('user_data_dir'):
-            browser_config.user_data_dir = config_options.get('user_data_dir')
-        
-        # Choose crawler strategy: browser vs HTTP-only
-        strategy = config_options.get('strategy', 'browser')
-        
-        if strategy == 'http':
-            # OPTION 1: Native AsyncHTTPCrawlerStrategy for high-performance HTTP-only crawling
-            max_connections = config_options.get('max_connections', 20)
-            async with AsyncHTTPCrawlerStrategy(max_connections=max_connections) as http_strategy:
-                if config_options.get('stream_mode'):
-                    # HTTP strategy with streaming simulation
-                    results = []
-                    tasks = [http_strategy.crawl(url) for url in urls]
-                    for i, task in enumerate(asyncio.as_completed(tasks)):
-                        try:
-                            result = await task
-                            formatted_result = {
-                                "success": result.success if hasattr(result, 'success') else True,
-                                "markdown": result.html if hasattr(result, 'html') else getattr(result, 'markdown', ''),
-                                "url": urls[tasks.index(task)] if hasattr(tasks, 'index') else urls[i] if i < len(urls) else '',
-                                "status_code": getattr(result, 'status_code', 200),
-                                "title": getattr(result, 'title', ''),
-                                "content_length": len(result.html) if hasattr(result, 'html') else 0,
-                                "error": getattr(result, 'error_message', None)
-                            }
-                            results.append(formatted_result)
-                        except Exception as e:
-                            results.append({
-                                "success": False,
-                                "markdown": "",
-                                "url": urls[i] if i < len(urls) else '',
-                                "status_code": 0,
-                                "title": "",
-                                "content_length": 0,
-                                "error": f"HTTP strategy error: {str(e)}"
-                            })
-                    return results
-                else:
-                    # HTTP strategy batch mode
-                    tasks = [http_strategy.crawl(url) for url in urls]
-                    http_results = await asyncio.gather(*tasks, return_exceptions=True)
-                    return [
-                        {
-                            "success": not isinstance(result, Exception) and getattr(result, 'success', True),
-                            "markdown": result.html if hasattr(result, 'html') and not isinstance(result, Exception) else "",
-                            "url": url,
-                            "status_code": getattr(result, 'status_code', 200) if not isinstance(result, Exception) else 0,
-                            "title": getattr(result, 'title', '') if not isinstance(result, Exception) else '',
-                            "content_length": len(result.html) if hasattr(result, 'html') and not isinstance(result, Exception) else 0,
-                            "error": str(result) if isinstance(result, Exception) else getattr(result, 'error_message', None)
-                        }
-                        for result, url in zip(http_results, urls)
-                    ]
-        else:
-            # OPTION 2: Native AsyncWebCrawler (browser strategy) - default
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                if config_options.get('stream_mode'):
-                    # Native streaming mode - process results as they complete
-                    results = []
-                    async for result in await crawler.arun_many(urls, config=crawl_config, dispatcher=dispatcher):
-                        formatted_result = {
-                            "success": result.success,
-                            "markdown": result.markdown.raw_markdown if result.success else "",
-                            "url": result.url,
-                            "status_code": getattr(result, 'status_code', 200),
-                            "title": getattr(result, 'title', ''),
-                            "content_length": len(result.markdown.raw_markdown) if result.success else 0,
-                            "error": result.error_message if not result.success else None
-                        }
-                        results.append(formatted_result)
-                    return results
-                else:
-                    # Native batch mode - get all results at once
-                    crawl_results = await crawler.arun_many(urls, config=crawl_config, dispatcher=dispatcher)
-                    return [
-                        {
-                            "success": result.success,
-                            "markdown": result.markdown.raw_markdown if result.success else "",
-                            "url": result.url,
-                            "status_code": getattr(result, 'status_code', 200),
-                            "title": getattr(result, 'title', ''),
-                            "content_length": len(result.markdown.raw_markdown) if result.success else 0,
-                            "error": result.error_message if not result.success else None
-                        }
-                        for result in crawl_results
-                    ]
-            
-    except Exception as e:
-        # Return error for all URLs if batch processing fails
-        return [
-            {
-                "success": False,
-                "markdown": "",
-                "url": url,
-                "status_code": 0,
-                "title": "",
-                "content_length": 0,
-                "error": f"Batch crawler exception: {str(e)}"
-            }
-            for url in urls
-        ]
-
-async def scrape_url(url, config=None):
-    """Scrape a URL and return clean markdown"""
-    try:
-        # Default browser configuration for clean scraping
-        browser_config = BrowserConfig(
-            headless=True,
-            viewport_width=1280,
-            viewport_height=720,
-            verbose=False,  # Disable verbose logging for clean JSON output
-            # Optimize for speed and content quality
-            extra_args=[
-                "--no-sandbox",
-                "--disable-dev-shm-usage", 
-                "--disable-gpu"
-            ]
-        )
-        
-        # Default crawler configuration optimized for documentation
-        run_config = CrawlerRunConfig(
-            cache_mode=CacheMode.BYPASS,  # Always fresh content for now
-            # Target main content areas (try broader selectors first)
-            css_selector="body",  # Start with body, let Crawl4AI do smart extraction
-            # Remove navigation and clutter  
-            excluded_tags=["nav", "footer", "aside", "header", "script", "style", "noscript", "iframe"],
-            # Quality filters
-            word_count_threshold=10,  # Lower threshold to get more content
-            exclude_external_links=True,
-            exclude_social_media_links=True,
-            exclude_external_images=True,
-            # Reasonable timeout
-            page_timeout=30000,  # 30 seconds
-            verbose=False  # Disable verbose logging
-        )
-        
-        # Apply custom config if provided
-        if config:
-            if 'css_selector' in config:
-                run_config.css_selector = config['css_selector']
-            if 'excluded_tags' in config:
-                run_config.excluded_tags = config['excluded_tags']
-            if 'word_count_threshold' in config:
-                run_config.word_count_threshold = config['word_count_threshold']
-            if 'page_timeout' in config:
-                run_config.page_timeout = config['page_timeout']
-        
-        # Perform the crawl
-        async with AsyncWebCrawler(config=browser_config) as crawler:
-            result = await crawler.arun(url=url, config=run_config)
-            
-            # Extract title from result if available
-            title = ""
-            if hasattr(result, 'title') and result.title:
-                title = result.title
-            elif hasattr(result, 'metadata') and result.metadata and 'title' in result.metadata:
-                title = result.metadata['title']
-            
-            return {
-                "success": result.success,
-                "markdown": result.markdown if result.success else "",
-                "url": result.url,
-                "status_code": getattr(result, 'status_code', 200),
-                "title": title,
-                "content_length": len(result.markdown) if result.success else 0,
-                "error": result.error_message if not result.success else None
-            }
-            
-    except Exception as e:
-        return {
-            "success": False,
-            "markdown": "",
-            "url": url,
-            "status_code": 0,
-            "title": "",
-            "content_length": 0,
-            "error": f"Crawler exception: {str(e)}"
-        }
-
-def validate_url(url):
-    """Basic URL validation"""
-    if not url:
-        return False, "URL cannot be empty"
-    
-    if not url.startswith(('http://', 'https://')):
-        return False, "URL must start with http:// or https://"
-    
-    # Basic format check
-    if not ('.' in url and len(url) > 10):
-        return False, "URL appears to be malformed"
-    
-    return True, ""
-
-def main():
-    """Main entry point - supports both single URL and native batch processing"""
-    if len(sys.argv) < 2:
-        print(json.dumps({
-            "success": False,
-            "error": "Usage: python3 scrape.py <url> [config_json] OR python3 scrape.py --native-batch-crawl --urls <urls_json> --config <config_json>",
-            "help": "Single URL: python3.11 scrape.py https://example.com\nBatch: python3 scrape.py --native-batch-crawl --urls '[\"url1\", \"url2\"]' --config '{\"strategy\": \"browser\"}'"
-        }))
-        sys.exit(1)
-    
-    # Check for native batch crawling mode
-    if sys.argv[1] == '--native-batch-crawl':
-        # Native batch processing mode
-        if len(sys.argv) < 6 or '--urls' not in sys.argv or '--config' not in sys.argv:
-            print(json.dumps({
-                "success": False,
-                "error": "Native batch mode requires: --native-batch-crawl --urls <urls_json> --config <config_json>",
-                "help": "Example: python3 scrape.py --native-batch-crawl --urls '[\"https://example.com\", \"https://google.com\"]' --config '{\"strategy\": \"browser\", \"stream_mode\": false}'"
-            }))
-            sys.exit(1)
-        
-        try:
-            # Parse URLs and config from command line arguments
-            urls_idx = sys.argv.index('--urls') + 1
-            config_idx = sys.argv.index('--config') + 1
-            
-            urls = json.loads(sys.argv[urls_idx])
-            config_options = json.loads(sys.argv[config_idx])
-            
-            # Validate URLs
-            if not isinstance(urls, list) or len(urls) == 0:
-                print(json.dumps({
-                    "success": False,
-                    "error": "URLs must be a non-empty list",
-                    "help": "Example: '[\"https://example.com\", \"https://google.com\"]'"
-                }))
-                sys.exit(1)
-            
-            # Validate each URL
-            for url in urls:
-                is_valid, error_msg = validate_url(url)
-                if not is_valid:
-                    print(json.dumps({
-                        "success": False,
-                        "error": f"Invalid URL '{url}': {error_msg}",
-                        "urls": urls
-                    }))
-                    sys.exit(1)
-            
-            # Run native batch crawler
-            results = asyncio.run(batch_crawl_native(urls, config_options))
-            print(json.dumps(results, indent=2, ensure_ascii=False))
-            
-        except ValueError as e:
-            print(json.dumps({
-                "success": False,
-                "error": f"Invalid arguments: {str(e)}",
-                "help": "Check --urls and --config JSON format"
-            }))
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            print(json.dumps({
-                "success": False,
-                "error": f"Invalid JSON: {e}",
-                "help": "Ensure URLs and config are valid JSON"
-            }))
-            sys.exit(1)
-        except Exception as e:
-            print(json.dumps({
-                "success": False,
-                "error": f"Batch crawling error: {str(e)}",
-                "urls": urls if 'urls' in locals() else []
-            }))
-            sys.exit(1)
-    
-    else:
-        # Original single URL mode (backward compatibility)
-        url = sys.argv[1].strip()
-        config = None
-        
-        # Validate URL
-        is_valid, error_msg = validate_url(url)
-        if not is_valid:
-            print(json.dumps({
-                "success": False,
-                "error": f"Invalid URL: {error_msg}",
-                "url": url
-            }))
-            sys.exit(1)
-        
-        # Parse config if provided
-        if len(sys.argv) > 2:
-            try:
-                config = json.loads(sys.argv[2])
-            except json.JSONDecodeError as e:
-                print(json.dumps({
-                    "success": False,
-                    "error": f"Invalid JSON config: {e}",
-                    "url": url
-                }))
-                sys.exit(1)
-        
-        # Run the single URL scraper
-        try:
-            result = asyncio.run(scrape_url(url, config))
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        except KeyboardInterrupt:
-            print(json.dumps({
-                "success": False,
-                "error": "Scraping interrupted by user",
-                "url": url
-            }))
-            sys.exit(1)
-        except Exception as e:
-            print(json.dumps({
-                "success": False,
-                "error": f"Unexpected error: {str(e)}",
-                "url": url
-            }))
-            sys.exit(1)
-
-if __name__ == "__main__":
+#!/usr/bin/env python3.11
+"""
+Simple Crawl4AI wrapper script for Node.js integration
+Usage: python3.11 scrape.py <url> [config_json]
+       python3.11 scrape.py --serve   (persistent daemon mode)
+"""
+
+import asyncio
+import copy
+import hashlib
+import re
+import sqlite3
+import sys
+import json
+import os
+import logging
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Use uvloop's libuv-backed event loop when available - it handles several
+# times more socket events per second than the stdlib selector loop, which
+# matters for the thousands of concurrent HTTP sockets in batch mode
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Prefer orjson for (de)serialization: it encodes in C and is several times
+# faster than stdlib json on the megabyte-scale markdown payloads we emit.
+# Fall back to stdlib json when it isn't installed.
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    # orjson already produces UTF-8 bytes, so the bytes path skips both the
+    # decode here and the re-encode inside text-mode stdout
+    json_dumps_bytes = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False)
+
+    def json_dumps_bytes(obj):
+        return json.dumps(obj, ensure_ascii=False).encode()
+
+    json_loads = json.loads
+
+def setup_logging():
+    """Redirect Crawl4AI logging to stderr to keep stdout clean for JSON"""
+    logging.basicConfig(
+        level=logging.WARNING,  # Only show warnings and errors
+        format='%(message)s',
+        stream=sys.stderr
+    )
+
+# crawl4ai pulls in Playwright, bs4, and friends - roughly 0.5-1 s of import
+# time. The names below are populated lazily by _load_crawl4ai() so that
+# argument errors exit immediately and the daemon starts serving stdin
+# without paying the import until the first crawl needs it.
+AsyncWebCrawler = None
+BrowserConfig = None
+CrawlerRunConfig = None
+CacheMode = None
+MemoryAdaptiveDispatcher = None
+CrawlerMonitor = None
+DisplayMode = None
+RateLimiter = None
+AsyncHTTPCrawlerStrategy = None
+
+_crawl4ai_loaded = False
+
+# Daemon mode must report a missing dependency as a per-request error the
+# caller can correlate by id; exiting mid-request would kill the loop with
+# in-flight tasks still pending. serve_loop() flips this on.
+_raise_on_missing_crawl4ai = False
+
+def _load_crawl4ai():
+    """Import crawl4ai on first use and bind its names at module scope"""
+    global _crawl4ai_loaded
+    if _crawl4ai_loaded:
+        return
+
+    global AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+    global MemoryAdaptiveDispatcher, CrawlerMonitor, DisplayMode
+    global RateLimiter, AsyncHTTPCrawlerStrategy
+    try:
+        from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+        from crawl4ai import MemoryAdaptiveDispatcher, CrawlerMonitor, DisplayMode
+        from crawl4ai import RateLimiter
+        from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
+    except ImportError as e:
+        message = f"Crawl4AI not installed: {e}. Run: pip install crawl4ai && crawl4ai-setup"
+        if _raise_on_missing_crawl4ai:
+            raise RuntimeError(message) from None
+        print(json_dumps({
+            "success": False,
+            "error": message,
+            "url": sys.argv[1] if len(sys.argv) > 1 else "",
+            "status_code": 0,
+            "markdown": ""
+        }))
+        sys.exit(1)
+
+    _crawl4ai_loaded = True
+
+class AimdController:
+    """
+    AIMD (additive-increase / multiplicative-decrease) concurrency controller.
+
+    Additively raises the concurrency limit while responses stay fast and
+    healthy, and multiplicatively halves it on 429/5xx/timeouts - the same
+    backpressure scheme TCP congestion control uses. A fixed limit either
+    underutilizes stable endpoints or hammers overloaded ones; this adapts.
+
+    Implemented as an asyncio.Semaphore whose effective size is grown by
+    releasing extra permits and shrunk by swallowing releases (a semaphore
+    cannot be resized directly).
+    """
+
+    def __init__(self, c_min=2, c_max=10, alpha=1, beta=0.5, target_ms=2000.0):
+        self.c_min = max(1, c_min)
+        self.c_max = max(self.c_min, c_max)
+        self.alpha = alpha
+        self.beta = beta
+        self.target_ms = target_ms
+        self.limit = self.c_min  # Start conservative, ramp up on success
+        self._sem = asyncio.Semaphore(self.limit)
+        self._debt = 0  # Permits to swallow after a limit decrease
+
+    def _set_limit(self, new_limit):
+        new_limit = min(self.c_max, max(self.c_min, int(new_limit)))
+        if new_limit > self.limit:
+            for _ in range(new_limit - self.limit):
+                if self._debt > 0:
+                    self._debt -= 1
+                else:
+                    self._sem.release()
+        elif new_limit < self.limit:
+            self._debt += self.limit - new_limit
+        self.limit = new_limit
+
+    def on_success(self, latency_ms):
+        """Additive increase while the endpoint keeps up with us"""
+        if latency_ms <= self.target_ms:
+            self._set_limit(self.limit + self.alpha)
+
+    def on_error(self):
+        """Multiplicative decrease on rate limiting / server errors"""
+        self._set_limit(self.limit * self.beta)
+
+    def slot(self):
+        """Async context manager holding one concurrency slot"""
+        return _AimdSlot(self)
+
+class _AimdSlot:
+    """One held AIMD concurrency slot (async context manager)"""
+
+    def __init__(self, controller):
+        self._controller = controller
+
+    async def __aenter__(self):
+        await self._controller._sem.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        controller = self._controller
+        if controller._debt > 0:
+            controller._debt -= 1  # Swallow the permit to shrink concurrency
+        else:
+            controller._sem.release()
+        return False
+
+# Status codes that signal "back off" rather than a per-URL failure
+_BACKOFF_STATUS_CODES = (429, 502, 503, 504)
+
+class HostLimiter:
+    """
+    Per-host concurrency partitioning with reactive rate-limit pauses.
+
+    One global connection limit lets a single slow host starve the rest of
+    the batch; giving each host its own semaphore keeps a stalled domain
+    from blocking crawls to healthy ones. When a host answers with
+    Retry-After (or an exhausted X-RateLimit-Remaining), only that host is
+    paused - the others keep going.
+    """
+
+    def __init__(self, per_host_limit=8):
+        self.per_host_limit = max(1, per_host_limit)
+        self._sems = {}
+        self._resume_at = {}
+
+    def sem(self, host):
+        if host not in self._sems:
+            self._sems[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._sems[host]
+
+    def pause(self, host, delay):
+        """Park a host until now + delay (keeps the furthest deadline)"""
+        resume = asyncio.get_running_loop().time() + delay
+        if resume > self._resume_at.get(host, 0.0):
+            self._resume_at[host] = resume
+
+    async def wait_if_paused(self, host):
+        while True:
+            delay = self._resume_at.get(host, 0.0) - asyncio.get_running_loop().time()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+def parse_retry_after(headers):
+    """Seconds to pause a host based on its rate-limit headers (0 = none)"""
+    if not headers:
+        return 0.0
+    lowered = {str(k).lower(): str(v) for k, v in headers.items()}
+
+    retry_after = lowered.get('retry-after')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            # HTTP-date form of Retry-After
+            try:
+                from email.utils import parsedate_to_datetime
+                from datetime import datetime, timezone
+                resume = parsedate_to_datetime(retry_after)
+                return max(0.0, (resume - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                return 0.0
+
+    if lowered.get('x-ratelimit-remaining') == '0':
+        return 1.0  # Quota exhausted but no explicit delay - back off briefly
+
+    return 0.0
+
+async def _crawl_in_slot(crawl, url, aimd):
+    """Run one crawl coroutine under the AIMD controller (aimd=None bypasses)"""
+    if aimd is None:
+        return await crawl(url)
+
+    async with aimd.slot():
+        start = asyncio.get_running_loop().time()
+        try:
+            result = await crawl(url)
+        except Exception:
+            aimd.on_error()
+            raise
+        latency_ms = (asyncio.get_running_loop().time() - start) * 1000.0
+        if getattr(result, 'status_code', 200) in _BACKOFF_STATUS_CODES:
+            aimd.on_error()
+        else:
+            aimd.on_success(latency_ms)
+        return result
+
+async def crawl_with_aimd(crawl, url, aimd, hosts=None):
+    """Crawl one URL under AIMD backpressure and per-host concurrency limits"""
+    if hosts is None:
+        return await _crawl_in_slot(crawl, url, aimd)
+
+    host = urlsplit(url).netloc
+    await hosts.wait_if_paused(host)
+    async with hosts.sem(host):
+        result = await _crawl_in_slot(crawl, url, aimd)
+
+    # Honor the server's rate-limit signals for this host only
+    delay = parse_retry_after(getattr(result, 'response_headers', None))
+    if delay > 0:
+        hosts.pause(host, delay)
+    return result
+
+def extract_title(result):
+    """Best-effort page title from a CrawlResult (attribute or metadata)"""
+    title = getattr(result, 'title', '') or ''
+    if not title:
+        metadata = getattr(result, 'metadata', None) or {}
+        title = metadata.get('title') or ''
+    return title
+
+def format_browser_result(result):
+    """Format one browser CrawlResult, reading raw_markdown exactly once"""
+    md = result.markdown.raw_markdown if result.success else ""
+    return {
+        "success": result.success,
+        "markdown": md,
+        "url": result.url,
+        "status_code": getattr(result, 'status_code', 200),
+        "title": extract_title(result),
+        "content_length": len(md),
+        "error": result.error_message if not result.success else None
+    }
+
+def format_http_result(result, url):
+    """
+    Format one CrawlResult produced by the HTTP-backed crawler.
+
+    The HTTP strategy reports transport-level success, so a 404/500 error
+    page still arrives with success=True and a body; treat any >=400 status
+    as a failure here so error pages never masquerade as content.
+    """
+    status = getattr(result, 'status_code', 200) or 0
+    success = bool(getattr(result, 'success', True)) and status < 400
+    md = result.markdown.raw_markdown if success else ""
+    return {
+        "success": success,
+        "markdown": md,
+        "url": getattr(result, 'url', url) or url,
+        "status_code": status,
+        "title": extract_title(result),
+        "content_length": len(md),
+        "error": (getattr(result, 'error_message', None) or f"HTTP {status}") if not success else None
+    }
+
+def format_error_result(url, message):
+    """Uniform failure record for a URL that produced no result"""
+    return {
+        "success": False,
+        "markdown": "",
+        "url": url,
+        "status_code": 0,
+        "title": "",
+        "content_length": 0,
+        "error": message
+    }
+
+async def run_windowed(urls, width, start_crawl):
+    """
+    Bounded pipelined submission: keep at most `width` crawl tasks in
+    flight, topping the window up as tasks finish, and yield each completed
+    task (named after its URL) in completion order.
+
+    A single gather over all N URLs materializes N coroutines up front and
+    waits for the slowest before anything is returned; the window keeps
+    memory O(width) regardless of batch size, produces the first result as
+    soon as it's done, and still saturates the pipe at `width` concurrency.
+    """
+    width = max(1, width)
+    url_iter = iter(urls)
+    pending = set()
+
+    while True:
+        while len(pending) < width:
+            url = next(url_iter, None)
+            if url is None:
+                break
+            pending.add(asyncio.create_task(start_crawl(url), name=url))
+        if not pending:
+            return
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task
+
+async def warm_dns(urls):
+    """
+    Pre-resolve the unique hosts of a batch before the crawl fan-out.
+
+    When all N URLs race into the connector at once, each triggers its own
+    DNS lookup; resolving the |hosts| unique names up front (concurrently)
+    collapses that to one query per host and seats the resolver cache that
+    later GETs reuse - noticeable when |hosts| is much smaller than N.
+    Failures are ignored here; they surface as normal crawl errors.
+    """
+    targets = set()
+    for url in urls:
+        parts = urlsplit(url)
+        if parts.hostname:
+            targets.add((parts.hostname, parts.port or (80 if parts.scheme == 'http' else 443)))
+    if not targets:
+        return
+
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.getaddrinfo(host, port) for host, port in targets),
+        return_exceptions=True
+    )
+
+# On-disk response cache: URL + normalized config hashed to a key, stored in
+# SQLite with a TTL. A fresh hit turns a repeat crawl into one indexed read,
+# which makes retries and re-requests from the Node layer idempotent and
+# nearly free. Opt-in via cache_ttl (seconds) in the request config.
+_cache_db = None
+_CACHE_PATH = Path.home() / '.claude' / 'crawled_docs' / '.response_cache.sqlite3'
+
+def _get_cache_db():
+    global _cache_db
+    if _cache_db is None:
+        _CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(_CACHE_PATH)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires INTEGER, payload BLOB)"
+        )
+        db.commit()
+        _cache_db = db
+    return _cache_db
+
+def cache_key(url, config=None):
+    """Stable hash of URL + the config fields that affect the result"""
+    normalized = json.dumps(config or {}, sort_keys=True, default=str)
+    return hashlib.blake2b((url + normalized).encode()).hexdigest()
+
+def cache_get(key):
+    """Return the cached result for key if still fresh, else None"""
+    try:
+        row = _get_cache_db().execute(
+            "SELECT payload FROM responses WHERE key = ? AND expires > ?",
+            (key, int(time.time()))
+        ).fetchone()
+        if row is None:
+            return None
+        return json_loads(row[0])
+    except (sqlite3.Error, OSError, ValueError):
+        # A broken cache must never break the crawl - OSError covers the
+        # mkdir/connect in _get_cache_db (read-only home, full disk, ...)
+        return None
+
+def cache_put(key, ttl, payload):
+    """Store a successful result under key for ttl seconds"""
+    try:
+        db = _get_cache_db()
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, expires, payload) VALUES (?, ?, ?)",
+            (key, int(time.time()) + int(ttl), json_dumps(payload).encode())
+        )
+        db.commit()
+    except (sqlite3.Error, OSError):
+        pass  # Cache writes are best-effort
+
+def compile_formatter(strategy):
+    """
+    Resolve the per-strategy result formatter once for a whole batch.
+
+    The lookup happens a single time before the fan-out, so the per-record
+    hot loop calls the formatter directly instead of re-deciding the
+    strategy for every URL. The shared helpers above stay the single source
+    of truth for the record layout on every code path.
+    """
+    return format_http_result if strategy == 'http' else format_browser_result
+
+# Shared HTTP-backed crawler - an AsyncWebCrawler whose strategy is the
+# pooled AsyncHTTPCrawlerStrategy. Crawls through it skip Chromium entirely
+# but still run the full extraction/markdown pipeline, and the keep-alive
+# connection pool persists across calls instead of being re-established
+# per URL.
+_http_crawler = None
+_http_crawler_lock = asyncio.Lock()
+
+def needs_browser(config=None):
+    """
+    Heuristic: does this request actually need a real browser?
+
+    JS execution, explicit waits, screenshots, and persistent browser
+    profiles need Chromium; plain HTML/documentation pages can go through
+    the far lighter HTTP transport (no browser launch at all).
+    """
+    if not config:
+        return False
+    return any(config.get(key) for key in (
+        'js_code', 'wait_for', 'screenshot', 'persistent_browser', 'user_data_dir'
+    ))
+
+def wants_http(config=None):
+    """
+    Route this request through the HTTP-backed crawler?
+
+    An explicit strategy always wins; without one, requests fall through to
+    the needs_browser() heuristic so plain pages avoid the browser launch.
+    """
+    strategy = (config or {}).get('strategy')
+    if strategy == 'http':
+        return True
+    if strategy == 'browser':
+        return False
+    return not needs_browser(config)
+
+async def get_http_crawler(max_connections=20, keepalive_timeout=None):
+    """Get the module-level HTTP-backed AsyncWebCrawler, starting it on first use"""
+    global _http_crawler
+    if _http_crawler is None:
+        # Serialize first-use startup: without the lock, two concurrent
+        # daemon requests can both observe None and the loser's session
+        # is overwritten and leaked unclosed
+        async with _http_crawler_lock:
+            if _http_crawler is None:
+                _load_crawl4ai()
+                kwargs = {"max_connections": max_connections}
+                if keepalive_timeout is not None:
+                    kwargs["keepalive_timeout"] = keepalive_timeout
+                try:
+                    strategy = AsyncHTTPCrawlerStrategy(**kwargs)
+                except TypeError:
+                    # Older crawl4ai versions don't accept keepalive_timeout
+                    strategy = AsyncHTTPCrawlerStrategy(max_connections=max_connections)
+                crawler = AsyncWebCrawler(crawler_strategy=strategy)
+                await crawler.__aenter__()
+                _http_crawler = crawler
+    return _http_crawler
+
+# Shared browser crawler - launched once per process with the default
+# profile and reused, so the browser + context startup cost is amortized
+# across all calls. Requests that override the browser profile get a
+# dedicated crawler instead (see crawl_single / batch_crawl_native).
+_crawler = None
+_crawler_lock = asyncio.Lock()
+
+async def get_crawler():
+    """Get the shared default-profile AsyncWebCrawler, launching it on first use"""
+    global _crawler
+    if _crawler is None:
+        # Same double-checked locking as get_http_crawler: concurrent first
+        # callers must not each launch (and leak) a Chromium instance
+        async with _crawler_lock:
+            if _crawler is None:
+                _load_crawl4ai()
+                crawler = AsyncWebCrawler(config=build_browser_config())
+                await crawler.__aenter__()
+                _crawler = crawler
+    return _crawler
+
+async def close_crawler():
+    """Close the shared browser crawler if it was started"""
+    global _crawler
+    if _crawler is not None:
+        try:
+            await _crawler.__aexit__(None, None, None)
+        except Exception:
+            pass  # Best-effort cleanup - the process is going away anyway
+        _crawler = None
+
+async def close_http_crawler():
+    """Close the shared HTTP-backed crawler (and its keep-alive pool) if started"""
+    global _http_crawler
+    if _http_crawler is not None:
+        try:
+            await _http_crawler.__aexit__(None, None, None)
+        except Exception:
+            pass  # Best-effort cleanup - the process is going away anyway
+        _http_crawler = None
+
+async def close_shared_resources():
+    """Tear down every shared module-level resource (daemon/CLI shutdown)"""
+    await close_crawler()
+    await close_http_crawler()
+
+async def http_crawl_single(url, config=None):
+    """Crawl one URL through the shared HTTP-backed crawler and format it"""
+    config = config or {}
+    try:
+        http_crawler = await get_http_crawler(
+            config.get('max_connections', 20),
+            config.get('keepalive_timeout')
+        )
+        result = await http_crawler.arun(url=url, config=build_run_config(config))
+        return format_http_result(result, url)
+    except Exception as e:
+        return format_error_result(url, f"HTTP strategy error: {str(e)}")
+
+async def batch_crawl_native(urls: list, config_options: dict):
+    """
+    Native Crawl4AI batch processing using arun_many() and all native features
+    Implements the standards-compliant approach from our implementation plan
+
+    With stream_ndjson enabled, each result is written to stdout as one JSON
+    line the moment its crawl completes (and the function returns None)
+    instead of accumulating the whole corpus in memory for one giant dump -
+    O(1) memory in batch size, and the consumer can start processing results
+    immediately.
+    """
+    stream_ndjson = bool(config_options.get('stream_ndjson'))
+    if stream_ndjson:
+        # NDJSON output only makes sense with completion-order processing
+        config_options['stream_mode'] = True
+
+    try:
+        _load_crawl4ai()
+
+        # Collapse N racing DNS lookups into one per unique host before
+        # launching the fan-out
+        if config_options.get('warm_dns', True):
+            await warm_dns(urls)
+
+        # Native configuration with all built-in options. stream=True makes
+        # arun_many() return an async generator (completion order) instead
+        # of a list - required for the streaming browser branch below.
+        crawl_config = CrawlerRunConfig(
+            cache_mode=getattr(CacheMode, config_options.get('cache_mode', 'ENABLED')),
+            stream=bool(config_options.get('stream_mode'))
+        )
+
+        # Add session_id if provided
+        if config_options.get('session_id'):
+            crawl_config.session_id = config_options.get('session_id')
+        
+        # COMPLETE native memory management (v0.7.x compliant)
+        dispatcher = MemoryAdaptiveDispatcher(
+            memory_threshold_percent=config_options.get('memory_threshold', 70.0),
+            check_interval=config_options.get('check_interval', 1.0),  # Native monitoring interval
+            max_session_permit=config_options.get('max_sessions', 10),
+            memory_wait_timeout=config_options.get('memory_wait_timeout', 300.0),  # v0.7.x parameter
+            rate_limiter=RateLimiter(
+                base_delay=tuple(config_options.get('base_delay', [0.5, 1.5])),
+                max_delay=config_options.get('max_delay', 30.0),
+                max_retries=config_options.get('max_retries', 5)
+            ) if config_options.get('enable_rate_limiting', True) else None,
+            monitor=None  # Disable monitor UI for subprocess to keep stdout clean
+        )
+        
+        # Native browser configuration with optional persistence (shared
+        # default object, copied only when this batch overrides a field)
+        browser_config = build_browser_config(config_options)
+        
+        # Choose crawler strategy: an explicit 'browser'/'http' request wins;
+        # otherwise requests that don't need JS/screenshots go through the
+        # HTTP-backed crawler - full markdown pipeline, no Chromium launch.
+        if wants_http(config_options):
+            # OPTION 1: AsyncWebCrawler over AsyncHTTPCrawlerStrategy for
+            # high-performance HTTP-only crawling (shared module-level
+            # instance, so keep-alive connections persist across batches)
+            http_crawler = await get_http_crawler(
+                config_options.get('max_connections', 20),
+                config_options.get('keepalive_timeout')
+            )
+
+            async def fetch(url):
+                return await http_crawler.arun(url=url, config=crawl_config)
+
+            # AIMD backpressure: ramp concurrency up on healthy responses,
+            # halve it on 429/5xx/timeouts instead of retrying blindly
+            aimd = AimdController(
+                c_min=2,
+                c_max=config_options.get('max_sessions', 10),
+                target_ms=config_options.get('aimd_target_ms', 2000.0)
+            ) if config_options.get('adaptive_concurrency', True) else None
+
+            # Partition concurrency per host so one slow or rate-limited
+            # domain can't starve the rest of the batch
+            hosts = HostLimiter(per_host_limit=config_options.get('per_host_limit', 8))
+
+            # Specialized formatter compiled once for the whole batch
+            _fmt = compile_formatter('http')
+
+            # Bounded submission window: only this many crawl tasks exist at
+            # a time, so memory is flat regardless of batch size
+            window = config_options.get('window_size', config_options.get('max_sessions', 10) * 2)
+
+            async def safe_crawl(url):
+                # Classify success/failure exactly once, when the task
+                # completes; every task resolves to a normalized record and
+                # never raises, so consumers just read task.result()
+                try:
+                    return _fmt(await crawl_with_aimd(fetch, url, aimd, hosts), url)
+                except Exception as e:
+                    return format_error_result(url, f"HTTP strategy error: {str(e)}")
+
+            if config_options.get('stream_mode'):
+                # HTTP strategy with streaming simulation: emit each record
+                # in completion order
+                results = []
+                async for task in run_windowed(urls, window, safe_crawl):
+                    formatted_result = task.result()
+                    if stream_ndjson:
+                        _write_response(formatted_result)
+                    else:
+                        results.append(formatted_result)
+                return None if stream_ndjson else results
+            else:
+                # HTTP strategy batch mode: same bounded window, but results
+                # are re-ordered to match the request order before returning
+                by_url = {}
+                async for task in run_windowed(urls, window, safe_crawl):
+                    by_url.setdefault(task.get_name(), []).append(task.result())
+                return [by_url[url].pop(0) for url in urls]
+        else:
+            # OPTION 2: Native AsyncWebCrawler (browser strategy) - default
+            # Specialized formatter compiled once for the whole batch
+            _fmt = compile_formatter('browser')
+
+            async def run_batch(crawler):
+                if config_options.get('stream_mode'):
+                    # Native streaming mode - process results as they complete
+                    results = []
+                    async for result in await crawler.arun_many(urls, config=crawl_config, dispatcher=dispatcher):
+                        formatted_result = _fmt(result)
+                        if stream_ndjson:
+                            _write_response(formatted_result)
+                        else:
+                            results.append(formatted_result)
+                    return None if stream_ndjson else results
+                else:
+                    # Native batch mode - get all results at once
+                    crawl_results = await crawler.arun_many(urls, config=crawl_config, dispatcher=dispatcher)
+                    return [_fmt(result) for result in crawl_results]
+
+            if browser_config is _DEFAULT_BROWSER_CFG:
+                # No browser overrides for this batch - run on the shared
+                # crawler so its warm browser survives into the next batch
+                return await run_batch(await get_crawler())
+
+            # Batch-specific browser profile (headless off, persistent user
+            # data dir, ...) - use a dedicated short-lived crawler
+            async with AsyncWebCrawler(config=browser_config) as crawler:
+                return await run_batch(crawler)
+
+    except Exception as e:
+        # Return error for all URLs if batch processing fails
+        error_results = [
+            format_error_result(url, f"Batch crawler exception: {str(e)}")
+            for url in urls
+        ]
+        if stream_ndjson:
+            for error_result in error_results:
+                _write_response(error_result)
+            return None
+        return error_results
+
+# Default config objects are built once and reused; per-request overrides
+# shallow-copy the default instead of reconstructing it, so the daemon path
+# pays O(1) object churn per call instead of rebuilding list literals and
+# config objects every time
+_DEFAULT_EXCLUDED_TAGS = ["nav", "footer", "aside", "header", "script", "style", "noscript", "iframe"]
+_DEFAULT_BROWSER_CFG = None
+_DEFAULT_RUN_CFG = None
+
+# Run-config fields callers are allowed to override per request
+_RUN_CONFIG_OVERRIDE_FIELDS = ('css_selector', 'excluded_tags', 'word_count_threshold', 'page_timeout')
+
+def build_browser_config(config_options=None):
+    """Default browser configuration for clean scraping (shared, copy-on-override)"""
+    global _DEFAULT_BROWSER_CFG
+    if _DEFAULT_BROWSER_CFG is None:
+        _load_crawl4ai()
+        _DEFAULT_BROWSER_CFG = BrowserConfig(
+            headless=True,
+            viewport_width=1280,
+            viewport_height=720,
+            verbose=False,  # Disable verbose logging for clean JSON output
+            # Optimize for speed and content quality
+            extra_args=[
+                "--no-sandbox",
+                "--disable-dev-shm-usage",
+                "--disable-gpu"
+            ]
+        )
+
+    config_options = config_options or {}
+    overrides = {}
+    if not config_options.get('headless', True):
+        overrides['headless'] = False
+    if config_options.get('persistent_browser'):
+        overrides['use_managed_browser'] = True
+    if config_options.get('user_data_dir'):
+        overrides['user_data_dir'] = config_options.get('user_data_dir')
+
+    if not overrides:
+        return _DEFAULT_BROWSER_CFG
+
+    # Copy so the shared default is never mutated
+    browser_config = copy.copy(_DEFAULT_BROWSER_CFG)
+    for field, value in overrides.items():
+        setattr(browser_config, field, value)
+    return browser_config
+
+def build_run_config(config=None):
+    """Default crawler configuration optimized for documentation, with overrides"""
+    global _DEFAULT_RUN_CFG
+    if _DEFAULT_RUN_CFG is None:
+        _load_crawl4ai()
+        _DEFAULT_RUN_CFG = CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS,  # Always fresh content for now
+            # Target main content areas (try broader selectors first)
+            css_selector="body",  # Start with body, let Crawl4AI do smart extraction
+            # Remove navigation and clutter
+            excluded_tags=_DEFAULT_EXCLUDED_TAGS,
+            # Quality filters
+            word_count_threshold=10,  # Lower threshold to get more content
+            exclude_external_links=True,
+            exclude_social_media_links=True,
+            exclude_external_images=True,
+            # Reasonable timeout
+            page_timeout=30000,  # 30 seconds
+            verbose=False  # Disable verbose logging
+        )
+
+    if not config:
+        return _DEFAULT_RUN_CFG
+
+    # Copy so the shared default is never mutated, then apply whitelisted
+    # overrides in one loop instead of a per-field branch chain
+    run_config = copy.copy(_DEFAULT_RUN_CFG)
+    for field in _RUN_CONFIG_OVERRIDE_FIELDS:
+        if field in config:
+            setattr(run_config, field, config[field])
+    return run_config
+
+async def crawl_single(crawler, url, config=None):
+    """Run one crawl on an already-open crawler and format the result"""
+    # Short-circuit on a fresh on-disk cache entry (opt-in via cache_ttl)
+    ttl = (config or {}).get('cache_ttl', 0)
+    if ttl:
+        key = cache_key(url, config)
+        cached = cache_get(key)
+        if cached is not None:
+            return cached
+
+    # Plain pages skip the browser entirely via the shared HTTP-backed
+    # crawler (an explicit strategy in the config always wins)
+    if wants_http(config):
+        result = await http_crawl_single(url, config)
+        if ttl and result.get("success"):
+            cache_put(key, ttl, result)
+        return result
+
+    try:
+        run_config = build_run_config(config)
+        if crawler is not None:
+            result = await crawler.arun(url=url, config=run_config)
+        else:
+            browser_config = build_browser_config(config)
+            if browser_config is _DEFAULT_BROWSER_CFG:
+                # Default profile - reuse the shared warm browser
+                crawler = await get_crawler()
+                result = await crawler.arun(url=url, config=run_config)
+            else:
+                # Overridden profile (user_data_dir, headful, ...) - the
+                # shared browser runs the default profile, so this request
+                # gets a dedicated short-lived crawler instead
+                async with AsyncWebCrawler(config=browser_config) as dedicated:
+                    result = await dedicated.arun(url=url, config=run_config)
+
+        # Extract title from result if available
+        title = ""
+        if hasattr(result, 'title') and result.title:
+            title = result.title
+        elif hasattr(result, 'metadata') and result.metadata and 'title' in result.metadata:
+            title = result.metadata['title']
+
+        formatted = {
+            "success": result.success,
+            "markdown": result.markdown if result.success else "",
+            "url": result.url,
+            "status_code": getattr(result, 'status_code', 200),
+            "title": title,
+            "content_length": len(result.markdown) if result.success else 0,
+            "error": result.error_message if not result.success else None
+        }
+        if ttl and formatted["success"]:
+            cache_put(key, ttl, formatted)
+        return formatted
+
+    except Exception as e:
+        return {
+            "success": False,
+            "markdown": "",
+            "url": url,
+            "status_code": 0,
+            "title": "",
+            "content_length": 0,
+            "error": f"Crawler exception: {str(e)}"
+        }
+
+async def scrape_once(url, config=None):
+    """One-shot wrapper: scrape a single URL, then close the shared browser"""
+    try:
+        return await scrape_url(url, config)
+    finally:
+        await close_shared_resources()
+
+async def scrape_url(url, config=None):
+    """Scrape a URL and return clean markdown (one-shot CLI path)"""
+    try:
+        # crawl_single handles cache lookup, HTTP-vs-browser routing, and
+        # lazy startup of the shared browser
+        return await crawl_single(None, url, config)
+    except Exception as e:
+        return {
+            "success": False,
+            "markdown": "",
+            "url": url,
+            "status_code": 0,
+            "title": "",
+            "content_length": 0,
+            "error": f"Crawler exception: {str(e)}"
+        }
+
+async def _connect_stdin():
+    """Wrap stdin in an asyncio StreamReader for the daemon loop"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    protocol = asyncio.StreamReaderProtocol(reader)
+    await loop.connect_read_pipe(lambda: protocol, sys.stdin)
+    return reader
+
+def _write_response(response):
+    """
+    Emit one newline-delimited JSON response on stdout.
+
+    Writes pre-encoded bytes straight to the binary buffer: text-mode
+    stdout would re-encode to UTF-8 and apply newline translation, which is
+    wasted CPU on megabyte-scale markdown payloads.
+    """
+    out = sys.stdout.buffer
+    out.write(json_dumps_bytes(response))
+    out.write(b"\n")
+    out.flush()
+
+async def serve_loop():
+    """
+    Persistent daemon mode: keep one AsyncWebCrawler open and serve many
+    newline-delimited JSON requests over stdin/stdout.
+
+    Request:  {"id": <any>, "url": "https://...", "config": {...}}
+    Response: {"id": <any>, ...same fields as single-URL mode}
+
+    This avoids paying the Chromium launch and crawl4ai import cost per URL,
+    which dominates wall time in the one-subprocess-per-call model. Requests
+    are dispatched concurrently, so responses may arrive out of order -
+    callers must correlate by "id".
+    """
+    global _raise_on_missing_crawl4ai
+    _raise_on_missing_crawl4ai = True
+
+    reader = await _connect_stdin()
+    pending = set()
+
+    async def handle_request(request):
+        req_id = request.get('id')
+        url = (request.get('url') or '').strip()
+
+        is_valid, error_msg = validate_url(url)
+        if not is_valid:
+            response = {
+                "id": req_id,
+                "success": False,
+                "markdown": "",
+                "url": url,
+                "status_code": 0,
+                "title": "",
+                "content_length": 0,
+                "error": f"Invalid URL: {error_msg}"
+            }
+        else:
+            # crawl_single starts the shared browser lazily only when needed
+            response = await crawl_single(None, url, request.get('config'))
+            response["id"] = req_id
+
+        _write_response(response)
+
+    try:
+        # Signal readiness; the shared browser is launched lazily on the
+        # first request that actually needs it
+        _write_response({"id": None, "ready": True})
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break  # stdin closed - parent process is gone, shut down
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                request = json_loads(line)
+            except json.JSONDecodeError as e:
+                _write_response({
+                    "id": None,
+                    "success": False,
+                    "error": f"Invalid JSON request: {e}"
+                })
+                continue
+
+            # Dispatch concurrently; the correlation id lets the caller
+            # match out-of-order responses back to requests
+            task = asyncio.create_task(handle_request(request))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        # Drain in-flight requests before closing the browser
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        await close_shared_resources()
+
+async def validate_urls_bulk(urls):
+    """
+    Validate every URL in one pass on a worker thread.
+
+    Returns a list of (url, error_message) for the invalid ones. Running the
+    pass via asyncio.to_thread lets pure-Python validation of large batches
+    overlap with crawler/session warm-up on the event loop.
+    """
+    def check():
+        bad = []
+        for url in urls:
+            is_valid, error_msg = validate_url(url)
+            if not is_valid:
+                bad.append((url, error_msg))
+        return bad
+
+    return await asyncio.to_thread(check)
+
+async def batch_crawl_validated(urls, config_options):
+    """
+    Bulk-validate URLs concurrently with transport warm-up, then crawl.
+
+    Instead of serializing validation before any startup work and aborting
+    on the first bad URL, validation runs on a worker thread while the HTTP
+    strategy warms up; every invalid URL is reported at once in a single
+    error object.
+    """
+    validation = asyncio.create_task(validate_urls_bulk(urls))
+
+    # Warm the shared HTTP-backed crawler concurrently with validation,
+    # when this batch is going to use it anyway
+    warmup = None
+    if wants_http(config_options):
+        async def warm():
+            # Strictly opportunistic: warm-up must neither write to stdout
+            # nor exit - probe the import quietly first so a missing
+            # crawl4ai is reported by the crawl path, not preempted here
+            try:
+                await asyncio.to_thread(__import__, 'crawl4ai')
+            except ImportError:
+                return
+            try:
+                await get_http_crawler(
+                    config_options.get('max_connections', 20),
+                    config_options.get('keepalive_timeout')
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # The crawl path re-runs startup and surfaces the error
+
+        warmup = asyncio.create_task(warm())
+
+    bad = await validation
+    if bad:
+        if warmup is not None:
+            # A rejected batch should not keep paying for warm-up; whatever
+            # did get started is torn down by the caller's shutdown path
+            warmup.cancel()
+            await asyncio.gather(warmup, return_exceptions=True)
+        return {
+            "success": False,
+            "error": "Invalid URLs: " + "; ".join(f"'{url}': {msg}" for url, msg in bad),
+            "invalid_urls": [{"url": url, "error": msg} for url, msg in bad],
+            "urls": urls
+        }
+
+    if warmup is not None:
+        await warmup
+
+    return await batch_crawl_native(urls, config_options)
+
+async def batch_crawl_once(urls, config_options):
+    """One-shot wrapper: run a batch, then close the shared resources"""
+    try:
+        return await batch_crawl_validated(urls, config_options)
+    finally:
+        # Close inside the running loop - the crawler/session objects are
+        # bound to it and cannot be closed from a fresh loop later
+        await close_shared_resources()
+
+# http(s) scheme, a host containing a dot, then anything non-whitespace.
+# Precompiled so batch validation of thousands of URLs is one C-level
+# regex scan each instead of several Python-level string checks.
+_URL_RE = re.compile(r'^https?://[^\s/]+\.[^\s]+$')
+
+def validate_url(url):
+    """Basic URL validation"""
+    if not url:
+        return False, "URL cannot be empty"
+
+    if not _URL_RE.match(url):
+        # Only on the failure path, figure out which message applies
+        if not url.startswith(('http://', 'https://')):
+            return False, "URL must start with http:// or https://"
+        return False, "URL appears to be malformed"
+
+    return True, ""
+
+def main():
+    """Main entry point - supports both single URL and native batch processing"""
+    setup_logging()
+
+    if len(sys.argv) < 2:
+        print(json_dumps({
+            "success": False,
+            "error": "Usage: python3 scrape.py <url> [config_json] OR python3 scrape.py --native-batch-crawl --urls <urls_json> --config <config_json> OR python3 scrape.py --serve",
+            "help": "Single URL: python3.11 scrape.py https://example.com\nBatch: python3 scrape.py --native-batch-crawl --urls '[\"url1\", \"url2\"]' --config '{\"strategy\": \"browser\"}'\nDaemon: python3.11 scrape.py --serve (newline-delimited JSON requests on stdin)"
+        }))
+        sys.exit(1)
+    
+    # Persistent daemon mode: serve many URLs over stdin/stdout
+    if sys.argv[1] == '--serve':
+        try:
+            asyncio.run(serve_loop())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # Check for native batch crawling mode
+    if sys.argv[1] == '--native-batch-crawl':
+        # Native batch processing mode
+        if len(sys.argv) < 6 or '--urls' not in sys.argv or '--config' not in sys.argv:
+            print(json_dumps({
+                "success": False,
+                "error": "Native batch mode requires: --native-batch-crawl --urls <urls_json> --config <config_json>",
+                "help": "Example: python3 scrape.py --native-batch-crawl --urls '[\"https://example.com\", \"https://google.com\"]' --config '{\"strategy\": \"browser\", \"stream_mode\": false}'"
+            }))
+            sys.exit(1)
+        
+        try:
+            # Parse URLs and config from command line arguments
+            urls_idx = sys.argv.index('--urls') + 1
+            config_idx = sys.argv.index('--config') + 1
+            
+            urls = json_loads(sys.argv[urls_idx])
+            config_options = json_loads(sys.argv[config_idx])
+            
+            # Validate URLs
+            if not isinstance(urls, list) or len(urls) == 0:
+                print(json_dumps({
+                    "success": False,
+                    "error": "URLs must be a non-empty list",
+                    "help": "Example: '[\"https://example.com\", \"https://google.com\"]'"
+                }))
+                sys.exit(1)
+            
+            # Run native batch crawler; URL validation happens inside,
+            # overlapped with transport warm-up, and reports all bad URLs
+            # at once. In stream_ndjson mode results were already written
+            # line-by-line; otherwise dump the list compactly (indenting
+            # doubles the bytes on megabyte-scale batches).
+            results = asyncio.run(batch_crawl_once(urls, config_options))
+            if isinstance(results, dict) and not results.get("success", True):
+                print(json_dumps(results))
+                sys.exit(1)
+            if results is not None:
+                _write_response(results)
+            
+        except ValueError as e:
+            print(json_dumps({
+                "success": False,
+                "error": f"Invalid arguments: {str(e)}",
+                "help": "Check --urls and --config JSON format"
+            }))
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            print(json_dumps({
+                "success": False,
+                "error": f"Invalid JSON: {e}",
+                "help": "Ensure URLs and config are valid JSON"
+            }))
+            sys.exit(1)
+        except Exception as e:
+            print(json_dumps({
+                "success": False,
+                "error": f"Batch crawling error: {str(e)}",
+                "urls": urls if 'urls' in locals() else []
+            }))
+            sys.exit(1)
+    
+    else:
+        # Original single URL mode (backward compatibility)
+        url = sys.argv[1].strip()
+        config = None
+        
+        # Validate URL
+        is_valid, error_msg = validate_url(url)
+        if not is_valid:
+            print(json_dumps({
+                "success": False,
+                "error": f"Invalid URL: {error_msg}",
+                "url": url
+            }))
+            sys.exit(1)
+        
+        # Parse config if provided
+        if len(sys.argv) > 2:
+            try:
+                config = json_loads(sys.argv[2])
+            except json.JSONDecodeError as e:
+                print(json_dumps({
+                    "success": False,
+                    "error": f"Invalid JSON config: {e}",
+                    "url": url
+                }))
+                sys.exit(1)
+        
+        # Run the single URL scraper
+        try:
+            result = asyncio.run(scrape_once(url, config))
+            _write_response(result)
+        except KeyboardInterrupt:
+            print(json_dumps({
+                "success": False,
+                "error": "Scraping interrupted by user",
+                "url": url
+            }))
+            sys.exit(1)
+        except Exception as e:
+            print(json_dumps({
+                "success": False,
+                "error": f"Unexpected error: {str(e)}",
+                "url": url
+            }))
+            sys.exit(1)
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
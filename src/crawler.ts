@@ -1,8 +1,21 @@
-import { spawn } from 'child_process';
+import { spawn, ChildProcess } from 'child_process';
 import path from 'path';
 import fs from 'fs';
 import type { ScrapeResult, CrawlerOptions, CrawlerConfig, BatchCrawlOptions, BatchScrapeResult } from './types';
 
+/**
+ * Bookkeeping for one in-flight request to the persistent Python daemon
+ *
+ * Learning: a correlation map (id -> pending promise) is how multiplexed
+ * protocols match out-of-order responses back to their requests - the same
+ * pattern JSON-RPC and HTTP/2 use.
+ */
+interface PendingDaemonRequest {
+  resolve: (result: ScrapeResult) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
+
 /**
  * Simple Web Crawler - TypeScript Implementation
  * 
@@ -20,6 +33,14 @@ export class SimpleCrawler {
   private readonly timeout: number;
   private readonly outputFile: string | null;
   private readonly verbose: boolean;
+  private readonly persistentProcess: boolean;
+
+  // Persistent daemon state (request 1: avoid cold-starting Chromium per URL)
+  private daemon: ChildProcess | null = null;
+  private daemonReady: Promise<void> | null = null;
+  private daemonBuffer = '';
+  private nextRequestId = 1;
+  private readonly pendingRequests = new Map<number, PendingDaemonRequest>();
 
   /**
    * Create a new SimpleCrawler instance
@@ -37,6 +58,7 @@ export class SimpleCrawler {
     this.timeout = options.timeout || 60000;
     this.outputFile = options.outputFile || null;
     this.verbose = options.verbose || false;
+    this.persistentProcess = options.persistentProcess !== false;
   }
 
   /**
@@ -75,7 +97,209 @@ export class SimpleCrawler {
    */
   async scrapeUrl(url: string, config: CrawlerConfig = {}): Promise<ScrapeResult> {
     this.checkSetup();
-    
+
+    // Preferred path: reuse one warm Python+Chromium process across calls.
+    // Cold-starting Playwright per URL costs seconds; the daemon pays it once.
+    if (this.persistentProcess) {
+      try {
+        return await this.scrapeUrlViaDaemon(url, config);
+      } catch (error) {
+        // Daemon unavailable (spawn failure, crash mid-request) - fall back
+        // to the original one-shot subprocess so callers still get a result
+        const err = error as Error;
+        this.log(`Daemon scrape failed (${err.message}), falling back to one-shot process`);
+      }
+    }
+
+    return this.scrapeUrlOnce(url, config);
+  }
+
+  /**
+   * Ensure the persistent Python daemon is running and has reported ready
+   *
+   * The daemon is spawned once with --serve and kept alive; it emits a
+   * {"ready": true} line after its browser is warm, then serves
+   * newline-delimited JSON requests until stdin closes.
+   */
+  private ensureDaemon(): Promise<void> {
+    if (this.daemon && this.daemonReady) {
+      return this.daemonReady;
+    }
+
+    this.log('Starting persistent crawler daemon');
+    const child = spawn(this.pythonPath, [this.scriptPath, '--serve']);
+    this.daemon = child;
+    this.daemonBuffer = '';
+
+    child.stdout!.on('data', (data: Buffer) => {
+      this.handleDaemonData(data);
+    });
+
+    child.stderr!.on('data', (data: Buffer) => {
+      this.log(`Daemon stderr: ${data.toString().trim()}`);
+    });
+
+    child.on('close', (code: number | null) => {
+      this.log(`Daemon exited with code ${code}`);
+      // An exit before the handshake must reject daemonReady immediately -
+      // e.g. on Windows, where --serve cannot wire stdin under the
+      // proactor loop - so callers fall back to one-shot mode right away
+      // instead of stalling for the full ready timeout
+      this.onDaemonFailed?.(new Error(`Crawler daemon exited before ready (code ${code})`));
+      this.failAllPending(new Error(`Crawler daemon exited (code ${code})`));
+      if (this.daemon === child) {
+        this.daemon = null;
+        this.daemonReady = null;
+      }
+    });
+
+    this.daemonReady = new Promise<void>((resolve, reject) => {
+      const readyTimer = setTimeout(() => {
+        this.onDaemonReady = null;
+        this.onDaemonFailed = null;
+        // Reap the stuck child and clear the cached (rejected) promise so
+        // a later call respawns instead of inheriting this failure forever
+        child.kill('SIGTERM');
+        if (this.daemon === child) {
+          this.daemon = null;
+          this.daemonReady = null;
+        }
+        reject(new Error('Crawler daemon did not become ready in time'));
+      }, this.timeout);
+
+      child.once('error', (error: Error) => {
+        if (this.daemon === child) {
+          this.daemon = null;
+          this.daemonReady = null;
+        }
+        this.onDaemonFailed?.(new Error(`Failed to spawn crawler daemon: ${error.message}`));
+      });
+
+      // First line from the daemon is the readiness handshake; exit or
+      // spawn failure before that line settles the promise the other way
+      this.onDaemonReady = () => {
+        clearTimeout(readyTimer);
+        this.onDaemonFailed = null;
+        resolve();
+      };
+      this.onDaemonFailed = (error: Error) => {
+        clearTimeout(readyTimer);
+        this.onDaemonReady = null;
+        this.onDaemonFailed = null;
+        reject(error);
+      };
+    });
+
+    return this.daemonReady;
+  }
+
+  /** Callback armed by ensureDaemon(), fired on the {"ready": true} line */
+  private onDaemonReady: (() => void) | null = null;
+
+  /** Callback armed by ensureDaemon(), fired if the daemon dies before ready */
+  private onDaemonFailed: ((error: Error) => void) | null = null;
+
+  /**
+   * Accumulate daemon stdout and dispatch complete NDJSON lines
+   */
+  private handleDaemonData(data: Buffer): void {
+    this.daemonBuffer += data.toString();
+
+    let newlineIndex: number;
+    while ((newlineIndex = this.daemonBuffer.indexOf('\n')) !== -1) {
+      const line = this.daemonBuffer.slice(0, newlineIndex).trim();
+      this.daemonBuffer = this.daemonBuffer.slice(newlineIndex + 1);
+      if (!line) continue;
+
+      let message: ScrapeResult & { id?: number | null; ready?: boolean };
+      try {
+        message = JSON.parse(line);
+      } catch {
+        this.log(`Ignoring unparseable daemon line: ${line.substring(0, 200)}`);
+        continue;
+      }
+
+      if (message.ready) {
+        this.onDaemonReady?.();
+        this.onDaemonReady = null;
+        continue;
+      }
+
+      // Correlate the response back to its pending request by id
+      const pending = message.id != null ? this.pendingRequests.get(message.id) : undefined;
+      if (pending) {
+        this.pendingRequests.delete(message.id as number);
+        clearTimeout(pending.timer);
+        delete message.id;
+        pending.resolve(message);
+      }
+    }
+  }
+
+  /** Reject every in-flight daemon request (daemon died or shut down) */
+  private failAllPending(error: Error): void {
+    for (const pending of this.pendingRequests.values()) {
+      clearTimeout(pending.timer);
+      pending.reject(error);
+    }
+    this.pendingRequests.clear();
+  }
+
+  /**
+   * Scrape one URL through the persistent daemon
+   */
+  private async scrapeUrlViaDaemon(url: string, config: CrawlerConfig): Promise<ScrapeResult> {
+    await this.ensureDaemon();
+
+    return new Promise<ScrapeResult>((resolve, reject) => {
+      const id = this.nextRequestId++;
+
+      const timer = setTimeout(() => {
+        this.pendingRequests.delete(id);
+        reject(new Error(`Scraping timeout after ${this.timeout}ms`));
+      }, this.timeout);
+
+      this.pendingRequests.set(id, { resolve, reject, timer });
+
+      const request: Record<string, unknown> = { id, url };
+      if (Object.keys(config).length > 0) {
+        request.config = config;
+      }
+
+      this.log(`Daemon crawl #${id}: ${url}`);
+      this.daemon!.stdin!.write(JSON.stringify(request) + '\n', (error) => {
+        if (error) {
+          this.pendingRequests.delete(id);
+          clearTimeout(timer);
+          reject(new Error(`Failed to write to crawler daemon: ${error.message}`));
+        }
+      });
+    });
+  }
+
+  /**
+   * Shut down the persistent daemon (if running)
+   *
+   * Closing stdin lets the Python side drain in-flight requests and close
+   * its browser cleanly; call this when the MCP server exits.
+   */
+  shutdown(): void {
+    if (this.daemon) {
+      this.log('Shutting down crawler daemon');
+      this.daemon.stdin?.end();
+      this.daemon = null;
+      this.daemonReady = null;
+    }
+    this.failAllPending(new Error('Crawler shut down'));
+  }
+
+  /**
+   * Scrape a single URL with a one-shot Python subprocess
+   *
+   * Original per-call path, kept as the fallback when the persistent
+   * daemon is disabled or unavailable.
+   */
+  private scrapeUrlOnce(url: string, config: CrawlerConfig = {}): Promise<ScrapeResult> {
     return new Promise<ScrapeResult>((resolve, reject) => {
       const args = [this.scriptPath, url];
       
@@ -237,14 +461,24 @@ export class SimpleCrawler {
         // Monitoring (v0.7.x CrawlerMonitor with DisplayMode)
         max_visible_rows: options.max_visible_rows || 15,
         
-        // Crawler strategy
-        strategy: options.strategy || 'browser',
+        // Crawler strategy: an explicit choice is forwarded as-is; 'auto'
+        // lets Python pick HTTP for requests that don't need a browser
+        strategy: options.strategy || 'auto',
         max_connections: options.max_connections || 20,
+        keepalive_timeout: options.keepalive_timeout || null,
+        adaptive_concurrency: options.adaptive_concurrency !== false,
+        aimd_target_ms: options.aimd_target_ms || 2000.0,
+        window_size: options.window_size || (options.max_sessions || 10) * 2,
+        per_host_limit: options.per_host_limit || 8,
         
         // Browser configuration
         headless: options.headless !== false,
         persistent_browser: options.persistent_browser || false,
-        user_data_dir: options.user_data_dir || null
+        user_data_dir: options.user_data_dir || null,
+
+        // Stream results as NDJSON lines so Python holds O(1) memory and
+        // Node can parse each result as soon as its crawl completes
+        stream_ndjson: options.stream_ndjson !== false
       };
 
       // Use --native-batch-crawl mode with v0.7.x features
@@ -257,10 +491,13 @@ export class SimpleCrawler {
 
       this.log(`Starting v0.7.x batch crawl: ${urls.length} URLs with ${nativeConfig.strategy} strategy`);
       const process = spawn(this.pythonPath, args);
-      
+
       let stdout = '';
       let stderr = '';
-      
+      let lineBuffer = '';
+      const streamedResults: ScrapeResult[] = [];
+      let errorEnvelope: { error?: string } | null = null;
+
       // Set up timeout
       const timer = setTimeout(() => {
         process.kill('SIGTERM');
@@ -268,7 +505,34 @@ export class SimpleCrawler {
       }, this.timeout);
 
       process.stdout.on('data', (data: Buffer) => {
-        stdout += data.toString();
+        const text = data.toString();
+        stdout += text;
+
+        // Parse NDJSON incrementally - each completed crawl arrives as one
+        // line, so results are consumed without waiting for the whole batch
+        lineBuffer += text;
+        let newlineIndex: number;
+        while ((newlineIndex = lineBuffer.indexOf('\n')) !== -1) {
+          const line = lineBuffer.slice(0, newlineIndex).trim();
+          lineBuffer = lineBuffer.slice(newlineIndex + 1);
+          if (!line) continue;
+          try {
+            const parsed = JSON.parse(line);
+            if (Array.isArray(parsed)) {
+              // stream_ndjson: false emits the whole result array as one
+              // compact line - spread it so each record stays one element
+              streamedResults.push(...parsed);
+            } else if (parsed && typeof parsed === 'object' && 'invalid_urls' in parsed) {
+              // Batch-level validation failure, not a per-URL result
+              errorEnvelope = parsed;
+            } else {
+              streamedResults.push(parsed);
+            }
+          } catch {
+            // Partial or non-JSON line - the close handler falls back to
+            // parsing the accumulated stdout
+          }
+        }
       });
 
       process.stderr.on('data', (data: Buffer) => {
@@ -278,10 +542,28 @@ export class SimpleCrawler {
       process.on('close', (code: number | null) => {
         clearTimeout(timer);
         const endTime = Date.now();
-        
+
+        // A validation envelope or a non-zero exit means the whole batch
+        // was rejected - propagate the failure instead of resolving with
+        // one bogus "result" record
+        if (errorEnvelope) {
+          reject(new Error(errorEnvelope.error || 'Batch crawl rejected'));
+          return;
+        }
+        if (code !== 0) {
+          const detail = stderr.trim()
+            || streamedResults.find(r => r && !r.success)?.error
+            || `exit code ${code}`;
+          reject(new Error(`Python batch process failed (code ${code}): ${detail}`));
+          return;
+        }
+
         try {
-          // Parse the batch results from Python
-          const pythonResults: ScrapeResult[] = JSON.parse(stdout);
+          // NDJSON lines were already parsed as they arrived; fall back to
+          // the legacy single-JSON-array output if none were seen
+          const pythonResults: ScrapeResult[] = streamedResults.length > 0
+            ? streamedResults
+            : JSON.parse(stdout);
           
           // Calculate batch metrics
           const successful = pythonResults.filter(r => r.success);
@@ -303,12 +585,8 @@ export class SimpleCrawler {
           resolve(batchResult);
           
         } catch (e) {
-          if (code !== 0) {
-            reject(new Error(`Python batch process failed (code ${code}): ${stderr}`));
-          } else {
-            const error = e as Error;
-            reject(new Error(`Failed to parse batch results: ${error.message}\nOutput: ${stdout.substring(0, 500)}`));
-          }
+          const error = e as Error;
+          reject(new Error(`Failed to parse batch results: ${error.message}\nOutput: ${stdout.substring(0, 500)}`));
         }
       });
 
@@ -103,9 +103,9 @@ function buildBatchOptions(options: ExtendedCliOptions): BatchCrawlOptions {
   if (options.preset) {
     batchOptions = mergePresetWithOptions(options.preset, customOptions);
   } else {
-    // Use defaults if no preset specified
+    // Use defaults if no preset specified; strategy is left unset so the
+    // Python side can auto-route plain pages through the HTTP crawler
     batchOptions = {
-      strategy: 'browser',
       memory_threshold: 75.0,
       max_sessions: 10,
       enable_rate_limiting: true,
@@ -317,7 +317,8 @@ Single URL Arguments:
 Batch Processing:
   -b, --batch <file>     Read URLs from file (one per line)
   -b, --batch -          Read URLs from stdin
-      --strategy <type>  Crawling strategy: browser (default) | http
+      --strategy <type>  Crawling strategy: browser | http (default: auto -
+                         http for plain pages, browser when JS is needed)
   -p, --preset <name>    Use configuration preset: ${availablePresets}
 
 Performance Tuning:
@@ -456,6 +457,7 @@ async function main(): Promise<void> {
       }
       
       // Exit with appropriate code
+      crawler.shutdown();
       process.exit(batchResult.success_rate > 0.5 ? 0 : 1);
       
     } else {
@@ -480,6 +482,7 @@ async function main(): Promise<void> {
       console.log(crawler.formatResult(result));
       
       // Exit with appropriate code based on result
+      crawler.shutdown();
       process.exit(result.success ? 0 : 1);
     }
     
@@ -490,6 +493,7 @@ async function main(): Promise<void> {
     if (options.verbose) {
       console.error(`Stack trace: ${err.stack}`);
     }
+    crawler.shutdown();
     process.exit(1);
   }
 }
@@ -450,6 +450,19 @@ class McpWebCrawlerServer {
       const transport = new StdioServerTransport();
       await this.server.connect(transport);
 
+      // Close the persistent crawler daemon cleanly when the server exits,
+      // so the Python side can drain in-flight requests and shut down
+      const shutdown = (): void => this.crawler.shutdown();
+      process.once('exit', shutdown);
+      process.once('SIGINT', () => {
+        shutdown();
+        process.exit(0);
+      });
+      process.once('SIGTERM', () => {
+        shutdown();
+        process.exit(0);
+      });
+
       // Server is now running and listening on stdin/stdout
       console.error('🕷️  MCP Web Crawler Server started');
       console.error('📡 Listening for MCP messages via stdio');
@@ -60,6 +60,9 @@ export interface CrawlerOptions {
   
   /** Enable verbose logging (default: false) */
   verbose?: boolean;
+
+  /** Reuse a single long-lived Python process across scrapes (default: true) */
+  persistentProcess?: boolean;
 }
 
 /**
@@ -83,6 +86,9 @@ export interface CrawlerConfig {
   
   /** Page timeout in milliseconds for the browser */
   page_timeout?: number;
+
+  /** Serve repeat crawls of the same URL+config from an on-disk cache for this many seconds (0 = always fresh) */
+  cache_ttl?: number;
 }
 
 /**
@@ -169,6 +175,24 @@ export interface BatchCrawlOptions {
   
   /** Maximum connections for HTTP strategy */
   max_connections?: number;
+
+  /** Keep-alive timeout in seconds for pooled HTTP connections */
+  keepalive_timeout?: number;
+
+  /** Enable AIMD adaptive concurrency for HTTP crawls (default: true) */
+  adaptive_concurrency?: boolean;
+
+  /** Target latency in ms above which AIMD stops increasing concurrency */
+  aimd_target_ms?: number;
+
+  /** Stream results from Python as NDJSON lines (default: true) */
+  stream_ndjson?: boolean;
+
+  /** Max in-flight crawl tasks in the HTTP batch window (default: 2x max_sessions) */
+  window_size?: number;
+
+  /** Max concurrent connections per host for HTTP crawls */
+  per_host_limit?: number;
   
   /** Run browser in headless mode */
   headless?: boolean;
@@ -0,0 +1,239 @@
+/**
+ * Persistent Daemon Protocol Unit Tests
+ * Tests the --serve daemon lifecycle: readiness handshake, NDJSON response
+ * parsing, request correlation, failure fallback, and shutdown.
+ */
+
+import { SimpleCrawler } from '../../src/crawler';
+import { delay } from '../helpers/test-utils';
+
+// Mock child_process to avoid actual Python calls during testing
+jest.mock('child_process', () => ({
+  spawn: jest.fn()
+}));
+
+import { spawn } from 'child_process';
+const mockedSpawn = spawn as jest.MockedFunction<typeof spawn>;
+
+/** First line the daemon emits once it is serving requests */
+const READY_LINE = '{"id": null, "ready": true}\n';
+
+interface MockDaemon {
+  child: any;
+  /** JSON request lines written to the daemon's stdin */
+  written: string[];
+  emitStdout(text: string): void;
+  emitClose(code: number): void;
+}
+
+/**
+ * Mock --serve daemon child: captures stdin writes and lets the test drive
+ * stdout chunks and process exit explicitly
+ */
+function createMockDaemon(): MockDaemon {
+  const written: string[] = [];
+  const handlers: Record<string, Array<(...args: any[]) => void>> = {};
+  const stdoutHandlers: Array<(data: Buffer) => void> = [];
+
+  const child = {
+    stdout: {
+      on: jest.fn((event: string, callback: (data: Buffer) => void) => {
+        if (event === 'data') stdoutHandlers.push(callback);
+      })
+    },
+    stderr: { on: jest.fn() },
+    stdin: {
+      write: jest.fn((line: string, callback?: (error?: Error) => void) => {
+        written.push(line);
+        callback?.();
+        return true;
+      }),
+      end: jest.fn()
+    },
+    on: jest.fn((event: string, callback: (...args: any[]) => void) => {
+      (handlers[event] = handlers[event] || []).push(callback);
+    }),
+    once: jest.fn((event: string, callback: (...args: any[]) => void) => {
+      (handlers[event] = handlers[event] || []).push(callback);
+    }),
+    kill: jest.fn()
+  };
+
+  return {
+    child,
+    written,
+    emitStdout(text: string) {
+      stdoutHandlers.forEach(callback => callback(Buffer.from(text)));
+    },
+    emitClose(code: number) {
+      (handlers['close'] || []).forEach(callback => callback(code));
+    }
+  };
+}
+
+/** One NDJSON response line for the given correlation id */
+function daemonResponse(id: number, overrides: Record<string, unknown> = {}): string {
+  return JSON.stringify({
+    id,
+    success: true,
+    markdown: '# Test',
+    url: 'https://example.com',
+    status_code: 200,
+    title: 'Test Page',
+    content_length: 6,
+    error: null,
+    ...overrides
+  }) + '\n';
+}
+
+/** Mock one-shot subprocess in the style of the existing crawler tests */
+function createMockOneShot(response: Record<string, unknown>): any {
+  return {
+    stdout: {
+      on: jest.fn((event: string, callback: (data: Buffer) => void) => {
+        if (event === 'data') callback(Buffer.from(JSON.stringify(response)));
+      })
+    },
+    stderr: { on: jest.fn() },
+    on: jest.fn((event: string, callback: (code: number) => void) => {
+      if (event === 'close') callback(0);
+    })
+  };
+}
+
+describe('SimpleCrawler persistent daemon', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('should spawn the daemon with --serve and resolve after the handshake', async () => {
+    const daemon = createMockDaemon();
+    mockedSpawn.mockReturnValue(daemon.child);
+
+    const crawler = new SimpleCrawler();
+    const promise = crawler.scrapeUrl('https://example.com');
+
+    daemon.emitStdout(READY_LINE);
+    await delay(0); // Let the request be written after the handshake
+
+    expect(mockedSpawn).toHaveBeenCalledWith(
+      'python3.11',
+      expect.arrayContaining([expect.stringContaining('scrape.py'), '--serve'])
+    );
+
+    const request = JSON.parse(daemon.written[0]);
+    expect(request.url).toBe('https://example.com');
+    daemon.emitStdout(daemonResponse(request.id));
+
+    const result = await promise;
+    expect(result.success).toBe(true);
+    expect(result.markdown).toBe('# Test');
+    expect(result).not.toHaveProperty('id'); // Correlation id is stripped
+  });
+
+  it('should correlate out-of-order responses by request id', async () => {
+    const daemon = createMockDaemon();
+    mockedSpawn.mockReturnValue(daemon.child);
+
+    const crawler = new SimpleCrawler();
+    const first = crawler.scrapeUrl('https://a.example.com');
+    const second = crawler.scrapeUrl('https://b.example.com');
+
+    daemon.emitStdout(READY_LINE);
+    await delay(0);
+
+    const [req1, req2] = daemon.written.map(line => JSON.parse(line));
+
+    // Answer the second request before the first
+    daemon.emitStdout(daemonResponse(req2.id, { url: 'https://b.example.com' }));
+    daemon.emitStdout(daemonResponse(req1.id, { url: 'https://a.example.com' }));
+
+    expect((await first).url).toBe('https://a.example.com');
+    expect((await second).url).toBe('https://b.example.com');
+    expect(mockedSpawn).toHaveBeenCalledTimes(1); // One daemon serves both
+  });
+
+  it('should reassemble NDJSON responses split across stdout chunks', async () => {
+    const daemon = createMockDaemon();
+    mockedSpawn.mockReturnValue(daemon.child);
+
+    const crawler = new SimpleCrawler();
+    const promise = crawler.scrapeUrl('https://example.com');
+
+    daemon.emitStdout(READY_LINE);
+    await delay(0);
+
+    const request = JSON.parse(daemon.written[0]);
+    const line = daemonResponse(request.id);
+    daemon.emitStdout(line.slice(0, 25));
+    daemon.emitStdout(line.slice(25));
+
+    const result = await promise;
+    expect(result.success).toBe(true);
+  });
+
+  it('should fall back to the one-shot process when the daemon exits before ready', async () => {
+    const daemon = createMockDaemon();
+    const oneShot = createMockOneShot({
+      success: true,
+      markdown: '# Fallback',
+      url: 'https://example.com',
+      status_code: 200,
+      title: 'Test Page',
+      content_length: 10,
+      error: null
+    });
+    mockedSpawn
+      .mockReturnValueOnce(daemon.child)
+      .mockReturnValueOnce(oneShot);
+
+    const crawler = new SimpleCrawler();
+    const promise = crawler.scrapeUrl('https://example.com');
+
+    // Daemon dies before the handshake (e.g. --serve unsupported on this
+    // platform) - the ready promise must reject immediately, not after the
+    // full scrape timeout
+    daemon.emitClose(1);
+
+    const result = await promise;
+    expect(result.success).toBe(true);
+    expect(result.markdown).toBe('# Fallback');
+    expect(mockedSpawn).toHaveBeenCalledTimes(2);
+  });
+
+  it('should use the one-shot process when persistentProcess is disabled', async () => {
+    const oneShot = createMockOneShot({
+      success: true,
+      markdown: '# Test',
+      url: 'https://example.com',
+      status_code: 200,
+      title: 'Test Page',
+      content_length: 6,
+      error: null
+    });
+    mockedSpawn.mockReturnValue(oneShot);
+
+    const crawler = new SimpleCrawler({ persistentProcess: false });
+    const result = await crawler.scrapeUrl('https://example.com');
+
+    expect(result.success).toBe(true);
+    const args = mockedSpawn.mock.calls[0][1] as string[];
+    expect(args).not.toContain('--serve');
+  });
+
+  it('should close daemon stdin on shutdown', async () => {
+    const daemon = createMockDaemon();
+    mockedSpawn.mockReturnValue(daemon.child);
+
+    const crawler = new SimpleCrawler();
+    const promise = crawler.scrapeUrl('https://example.com');
+
+    daemon.emitStdout(READY_LINE);
+    await delay(0);
+    daemon.emitStdout(daemonResponse(JSON.parse(daemon.written[0]).id));
+    await promise;
+
+    crawler.shutdown();
+    expect(daemon.child.stdin.end).toHaveBeenCalled();
+  });
+});